@@ -4,16 +4,28 @@ DO NOT MODIFY - This is part of the course infrastructure.
 
 """
 
+import asyncio
 import json
 import os
 import glob
 import copy
+import inspect
+import time
 import traceback
 
+import instrumentation
+from warm_start import WARM_MODES, SolutionIndex, read_solution
 
-def load_template():
+
+REPORT_DIR = os.path.join('solutions', 'report')
+
+
+def load_template(template_name='template.html'):
     """
-    Load the HTML template for puzzle visualization.
+    Load an HTML template for puzzle visualization.
+
+    Args:
+        template_name (str): File name inside templates/
 
     Returns:
         str: HTML template content
@@ -21,7 +33,7 @@ def load_template():
     Raises:
         FileNotFoundError: If template file is not found
     """
-    template_path = os.path.join('templates', 'template.html')
+    template_path = os.path.join('templates', template_name)
     template_path = os.path.normpath(template_path)
 
     try:
@@ -30,7 +42,7 @@ def load_template():
     except FileNotFoundError:
         raise FileNotFoundError(
             f"Template file not found at {template_path}\n"
-            f"Make sure 'templates/template.html' exists in the project root."
+            f"Make sure 'templates/{template_name}' exists in the project root."
         )
 
 
@@ -96,6 +108,111 @@ def create_html_from_json_data(data, output_html):
         f.write(html_content)
 
 
+def compact_report_data(data):
+    """
+    Reduce a solution dict to the compact form used by the batch report:
+    {"w", "h", "islands": [[x, y, req, id]], "solution": [[x1, y1, x2, y2, bridges]]}
+    Bridges given by island ids (id1/id2) are resolved to coordinates.
+    """
+    islands = [list(isl[:4]) for isl in data.get("islands", []) if isinstance(isl, list)]
+    by_id = {isl[3]: isl for isl in islands if len(isl) >= 4}
+
+    solution = []
+    for bridge in data.get("solution", []):
+        if not isinstance(bridge, dict):
+            continue
+        try:
+            solution.append([bridge['x1'], bridge['y1'], bridge['x2'], bridge['y2'],
+                             bridge.get('bridges', 0)])
+        except KeyError:
+            if bridge.get('id1') in by_id and bridge.get('id2') in by_id:
+                a, b = by_id[bridge['id1']], by_id[bridge['id2']]
+                solution.append([a[0], a[1], b[0], b[1], bridge.get('bridges', 0)])
+
+    return {
+        "w": data.get("width"),
+        "h": data.get("height"),
+        "islands": islands,
+        "solution": solution
+    }
+
+
+def report_entry(record):
+    """
+    Index entry of a record for the batch report:
+    [name, width, height, num_islands, status].
+    """
+    solution = record['solution'] or {}
+    return [record['name'], solution.get('width'), solution.get('height'),
+            record['num_islands'], record['status']]
+
+
+def write_report_data(name, data, report_dir=REPORT_DIR, entry=None):
+    """
+    Write the lazily loaded data file of one puzzle for the batch report
+    (report_dir/data/<name>.js).
+
+    entry (see report_entry) is stored on the first line as a comment, so
+    write_report_index can list the puzzle without parsing its data.
+    """
+    data_dir = os.path.join(report_dir, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    data_file = os.path.join(data_dir, f'{name}.js')
+    payload = json.dumps(compact_report_data(data), separators=(',', ':'))
+    header = ''
+    if entry is not None:
+        header = '// ' + json.dumps(entry, separators=(',', ':')) + '\n'
+    with open(data_file, 'w', encoding='utf-8') as f:
+        f.write(f'{header}hashiReport.load({json.dumps(name)},{payload});\n')
+    return data_file
+
+
+def read_report_entry(data_file):
+    """
+    Index entry of a batch report data file, from its header line or, for
+    files written without one, from its data. None if it cannot be read.
+    """
+    try:
+        with open(data_file, 'r', encoding='utf-8') as f:
+            first = f.readline()
+        if first.startswith('// '):
+            return json.loads(first[3:])
+    except (OSError, ValueError):
+        return None
+    data = read_solution(data_file)
+    if data is None:
+        return None
+    name = os.path.basename(data_file)[:-len('.js')]
+    status = 'solved' if data['solution'] else 'unsolved'
+    return [name, data['width'], data['height'], len(data['islands']), status]
+
+
+def write_report_index(entries=(), report_dir=REPORT_DIR):
+    """
+    Write the single index page of the batch report.
+
+    The index lists every data file in report_dir/data, so shards or runs
+    writing to the same report all stay reachable. Puzzles with a known
+    entry ([name, width, height, num_islands, status], e.g. those solved in
+    this run) are not read again; the rest come from read_report_entry.
+    """
+    known = {entry[0]: entry for entry in entries}
+    index_entries = []
+    for data_file in sorted(glob.glob(os.path.join(report_dir, 'data', '*.js'))):
+        name = os.path.basename(data_file)[:-len('.js')]
+        entry = known.get(name) or read_report_entry(data_file)
+        if entry is not None:
+            index_entries.append(entry)
+
+    os.makedirs(report_dir, exist_ok=True)
+    index_file = os.path.join(report_dir, 'index.html')
+    embedded_index = json.dumps(index_entries, separators=(',', ':')).replace('</', '<\\/')
+    html_content = load_template('report.html').replace("{embedded_index}", embedded_index)
+    with open(index_file, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    return index_file
+
+
 def validate_solution_format(solution_data):
     if solution_data is None:
         return False
@@ -138,91 +255,459 @@ def load_puzzle(filename):
     return [dimensions, islands_data]
 
 
-def run_solver(solver_function, puzzle_pattern='./mypuzzles/*.json', max_puzzles=100):
+def build_final_solution(dimensions, orig_islands, solution_result):
     """
-    Run a solver function on all puzzle files matching the pattern.
-    
+    Normalize whatever the solver returned into the solution dict that is
+    written to solutions/ and rendered by the template.
+
+    Args:
+        dimensions (list): [width, height] of the puzzle
+        orig_islands (list): Islands as loaded from the puzzle file
+        solution_result: Solver return value (dict, list of bridges or None)
+
+    Returns:
+        dict: {"width", "height", "islands", "solution"}
     """
-    os.makedirs('solutions', exist_ok=True)
-    puzzle_files = glob.glob(puzzle_pattern)
+    if solution_result is None:
+        return {
+            "width": dimensions[0],
+            "height": dimensions[1],
+            "islands": orig_islands,
+            "solution": []
+        }
 
-    stats = {
-        'total': 0,
-        'solved': 0,
-        'unsolved': 0,
-        'errors': 0
+    if isinstance(solution_result, dict) and 'solution' in solution_result:
+        islands_from_solver = solution_result.get("islands")
+        use_solver_islands = False
+        if isinstance(islands_from_solver, list) and len(islands_from_solver) == len(orig_islands):
+            try:
+                if all(isinstance(it, list) and len(it) >= 3 for it in islands_from_solver):
+                    use_solver_islands = True
+            except Exception:
+                use_solver_islands = False
+
+        islands_to_use = islands_from_solver if use_solver_islands else orig_islands
+
+        return {
+            "width": solution_result.get("width", dimensions[0]),
+            "height": solution_result.get("height", dimensions[1]),
+            "islands": islands_to_use,
+            "solution": solution_result.get("solution", [])
+        }
+
+    return {
+        "width": dimensions[0],
+        "height": dimensions[1],
+        "islands": orig_islands,
+        "solution": solution_result
     }
 
-    for puzzle_file in puzzle_files[:max_puzzles]:
-        stats['total'] += 1
-        print(f"\n{'='*60}")
-        print(f"Processing: {puzzle_file}")
-        print(f"{'='*60}")
 
+def parse_shard(shard):
+    """
+    Parse a shard spec "i/N" (0 <= i < N) into (i, N). Tuples pass through.
+    """
+    if isinstance(shard, str):
         try:
+            index, count = (int(part) for part in shard.split('/'))
+        except ValueError:
+            raise ValueError(f"Invalid shard {shard!r}, expected 'i/N'")
+    else:
+        index, count = shard
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {shard!r}, expected 0 <= i < N")
+    return index, count
+
+
+def list_puzzle_files(puzzle_pattern='./mypuzzles/*.json', max_puzzles=100, shard=None):
+    """
+    Return the puzzle files matching the pattern in sorted order, truncated
+    to max_puzzles.
+
+    If shard ("i/N" or (i, N)) is given, only every N-th file starting at
+    index i is kept, so N machines running shards 0..N-1 cover the same
+    files as a single run.
+    """
+    puzzle_files = sorted(glob.glob(puzzle_pattern))[:max_puzzles]
+    if shard is not None:
+        index, count = parse_shard(shard)
+        puzzle_files = puzzle_files[index::count]
+    return puzzle_files
+
+
+def accepts_keyword(function, name):
+    """
+    True if function (or functools.partial) can be called with name=...
+    """
+    try:
+        parameters = inspect.signature(function).parameters
+    except (TypeError, ValueError):
+        return False
+    return name in parameters or any(
+        p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values())
+
+
+def solve_puzzle_file(solver_function, puzzle_file, solution_index=None, warm_mode='assumptions',
+                      warm_baseline=False, simplify=False):
+    """
+    Load and solve a single puzzle file.
+
+    If solution_index (a warm_start.SolutionIndex) is given and holds a
+    previous solution for this puzzle or a similar one, it is passed to the
+    solver as previous_solution=... together with warm_mode. With
+    warm_baseline the solver is also asked to measure a cold solve of the
+    same puzzle (measure_cold=True); that extra solve is left out of
+    solve_time. simplify=True asks the solver to simplify the CNF first
+    (see simplify.py). Each of these keywords is only passed if the solver
+    accepts it (see accepts_keyword).
+
+    Returns:
+        dict: Record describing the outcome:
+            - name: base name of the puzzle file (no extension)
+            - file: path of the puzzle file
+            - status: 'solved', 'unsolved' or 'error'
+            - solution: normalized solution dict (None on error)
+            - error / traceback: error message and traceback (None otherwise)
+            - load_time / solve_time: seconds spent loading and solving
+              (without the warm_baseline cold solve)
+            - num_islands / num_bridges: counts for the puzzle and solution
+            - warm_start: {'source', 'similarity'} of the previous solution
+              used as a hint, or None
+            - precheck / precheck_reason: the solver's check_infeasible
+              result and its reason, when it rejected the puzzle before
+              encoding (None otherwise)
+            - solver_stats: the other diagnostics reported by the solver
+              (edges, warm_mapped, simplify, solve-call solve_time and
+              conflicts and, with warm_baseline, cold_solve_time,
+              cold_conflicts); empty if not reported
+
+    Solvers that accept a diagnostics=... keyword (as
+    solver.solve_hashi_true_sat does) get a dict to report such details.
+    """
+    record = {
+        'name': os.path.splitext(os.path.basename(puzzle_file))[0],
+        'file': puzzle_file,
+        'status': 'error',
+        'solution': None,
+        'error': None,
+        'traceback': None,
+        'load_time': 0.0,
+        'solve_time': 0.0,
+        'num_islands': 0,
+        'num_bridges': 0,
+        'warm_start': None,
+        'precheck': None,
+        'precheck_reason': None,
+        'solver_stats': {}
+    }
+
+    try:
+        t0 = time.perf_counter()
+        with instrumentation.stage('load'):
             result = load_puzzle(puzzle_file)
             dimensions = result[0]
-            islands_data = result[1]  
+            islands_data = result[1]
             orig_islands = copy.deepcopy(islands_data)
+        t1 = time.perf_counter()
+
+        kwargs = {}
+        diagnostics = None
+        if accepts_keyword(solver_function, 'diagnostics'):
+            diagnostics = kwargs['diagnostics'] = {}
+        if simplify and accepts_keyword(solver_function, 'simplify'):
+            kwargs['simplify'] = True
+
+        previous = None
+        if solution_index is not None and accepts_keyword(solver_function, 'previous_solution'):
+            previous = solution_index.find(orig_islands, record['name'])
+        if previous is not None:
+            previous_solution, source, score = previous
+            record['warm_start'] = {'source': source, 'similarity': score}
+            kwargs['previous_solution'] = previous_solution
+            if accepts_keyword(solver_function, 'warm_mode'):
+                kwargs['warm_mode'] = warm_mode
+            if warm_baseline and accepts_keyword(solver_function, 'measure_cold'):
+                kwargs['measure_cold'] = True
+
+        solution_result = solver_function(dimensions, islands_data, **kwargs)
+        t2 = time.perf_counter()
+
+        if diagnostics:
+            if diagnostics.get('precheck') is not None:
+                record['precheck'] = diagnostics['precheck']
+                record['precheck_reason'] = diagnostics['precheck'].get('reason')
+            record['solver_stats'] = {k: v for k, v in diagnostics.items() if k != 'precheck'}
+
+        final_solution = build_final_solution(dimensions, orig_islands, solution_result)
+
+        record['load_time'] = t1 - t0
+        record['solve_time'] = t2 - t1 - record['solver_stats'].get('cold_baseline_time', 0.0)
+        record['num_islands'] = len(orig_islands)
+        record['solution'] = final_solution
+        if solution_result is None:
+            record['status'] = 'unsolved'
+        else:
+            record['status'] = 'solved'
+            record['num_bridges'] = sum(
+                b.get('bridges', 0) for b in final_solution['solution'] if isinstance(b, dict)
+            )
+    except Exception as e:
+        record['error'] = str(e)
+        record['traceback'] = traceback.format_exc()
 
-            solution_result = solver_function(dimensions, islands_data)
+    return record
 
 
-            base_name = os.path.splitext(os.path.basename(puzzle_file))[0]
-            solution_json_file = f'./solutions/{base_name}_solution.json'
-            output_html_file = f'./solutions/{base_name}.html'
+def _solve_puzzle_in_stage(solver_function, puzzle_file, solution_index, warm_mode, warm_baseline,
+                           simplify):
+    with instrumentation.stage('puzzle', file=puzzle_file):
+        return solve_puzzle_file(solver_function, puzzle_file, solution_index, warm_mode,
+                                 warm_baseline, simplify)
 
-            if solution_result is None:
-                final_solution = {
-                    "width": dimensions[0],
-                    "height": dimensions[1],
-                    "islands": orig_islands,
-                    "solution": []
-                }
-                print(f"✗ NO SOLUTION found for {puzzle_file}")
-                stats['unsolved'] += 1
-            else:
-                if isinstance(solution_result, dict) and 'solution' in solution_result:
-                    islands_from_solver = solution_result.get("islands")
-                    use_solver_islands = False
-                    if isinstance(islands_from_solver, list) and len(islands_from_solver) == len(orig_islands):
-                        try:
-                            if all(isinstance(it, list) and len(it) >= 3 for it in islands_from_solver):
-                                use_solver_islands = True
-                        except Exception:
-                            use_solver_islands = False
 
-                    islands_to_use = islands_from_solver if use_solver_islands else orig_islands
+def iter_solver(solver_function, puzzle_pattern='./mypuzzles/*.json', max_puzzles=100,
+                warm_start=False, warm_mode='assumptions', solutions_dir='solutions',
+                shard=None, skip_files=(), on_start=None, warm_baseline=False, simplify=False):
+    """
+    Solve the puzzles matching the pattern one by one, yielding a record
+    (see solve_puzzle_file) as soon as each puzzle is finished.
 
-                    final_solution = {
-                        "width": solution_result.get("width", dimensions[0]),
-                        "height": solution_result.get("height", dimensions[1]),
-                        "islands": islands_to_use,
-                        "solution": solution_result.get("solution", [])
-                    }
-                else:
-                    final_solution = {
-                        "width": dimensions[0],
-                        "height": dimensions[1],
-                        "islands": orig_islands,
-                        "solution": solution_result
-                    }
-
-                print(f"✓ SOLVED: {puzzle_file}")
-                stats['solved'] += 1
-
-            with open(solution_json_file, 'w', encoding='utf-8') as jf:
-                json.dump(final_solution, jf, indent=4, ensure_ascii=False)
-
-            create_html_from_json_data(final_solution, output_html_file)
-            print(f"  → JSON: {solution_json_file}")
-            print(f"  → HTML: {output_html_file}")
-
-        except Exception as e:
-            print(f"✗ ERROR processing {puzzle_file}: {str(e)}")
-            traceback.print_exc()
+    on_start, if given, is called with the puzzle file right before it is
+    solved (e.g. print_record_header, so console output stays grouped).
+
+    shard restricts the run to a slice of the corpus (see list_puzzle_files);
+    files in skip_files (e.g. completed_files of a manifest) are not solved.
+
+    With warm_start, the solutions already stored in solutions_dir are
+    indexed before the run and used as hints for the solver; warm_baseline
+    also measures a cold solve of each warm-started puzzle. simplify is
+    passed on to the solver (see solve_puzzle_file).
+
+    Nothing is printed or written to disk (solver.solve_hashi_true_sat
+    does not print either; it reports through diagnostics, see
+    solve_puzzle_file); use print_record and write_solution_files to
+    consume the stream.
+    """
+    solution_index = SolutionIndex(solutions_dir) if warm_start else None
+    for puzzle_file in list_puzzle_files(puzzle_pattern, max_puzzles, shard):
+        if os.path.normpath(puzzle_file) in skip_files:
+            continue
+        if on_start is not None:
+            on_start(puzzle_file)
+        yield _solve_puzzle_in_stage(solver_function, puzzle_file, solution_index, warm_mode,
+                                     warm_baseline, simplify)
+
+
+async def aiter_solver(solver_function, puzzle_pattern='./mypuzzles/*.json', max_puzzles=100,
+                       executor=None, warm_start=False, warm_mode='assumptions', solutions_dir='solutions',
+                       shard=None, skip_files=(), on_start=None, warm_baseline=False,
+                       simplify=False):
+    """
+    Asyncio variant of iter_solver. on_start is called on the event loop
+    when a puzzle is submitted to the executor.
+
+    Puzzles are solved one at a time in an executor so the event loop stays
+    free. The next puzzle starts solving before the current record is
+    yielded, so the consumer works while the solver keeps going; at most one
+    pending result is held in memory.
+
+        async for record in aiter_solver(solver.solve_hashi_true_sat):
+            ...
+    """
+    loop = asyncio.get_running_loop()
+    puzzle_files = [f for f in list_puzzle_files(puzzle_pattern, max_puzzles, shard)
+                    if os.path.normpath(f) not in skip_files]
+    if not puzzle_files:
+        return
+
+    solution_index = SolutionIndex(solutions_dir) if warm_start else None
+    if on_start is not None:
+        on_start(puzzle_files[0])
+    pending = loop.run_in_executor(executor, _solve_puzzle_in_stage, solver_function,
+                                   puzzle_files[0], solution_index, warm_mode, warm_baseline, simplify)
+    for puzzle_file in puzzle_files[1:]:
+        record = await pending
+        if on_start is not None:
+            on_start(puzzle_file)
+        pending = loop.run_in_executor(executor, _solve_puzzle_in_stage, solver_function,
+                                       puzzle_file, solution_index, warm_mode, warm_baseline,
+                                       simplify)
+        yield record
+    yield await pending
+
+
+def write_solution_files(record, output_dir='solutions', html=True):
+    """
+    Write the JSON solution and, if html is set, the standalone HTML
+    visualization of a record.
+
+    Returns:
+        tuple: (solution_json_file, output_html_file or None)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    solution_json_file = os.path.join(output_dir, f'{record["name"]}_solution.json')
+    output_html_file = os.path.join(output_dir, f'{record["name"]}.html')
+
+    with open(solution_json_file, 'w', encoding='utf-8') as jf:
+        json.dump(record['solution'], jf, indent=4, ensure_ascii=False)
+
+    if not html:
+        return solution_json_file, None
+
+    create_html_from_json_data(record['solution'], output_html_file)
+    return solution_json_file, output_html_file
+
+
+def print_record_header(puzzle_file):
+    """
+    Print the "Processing" header of a puzzle, before it is solved.
+    """
+    print(f"\n{'='*60}")
+    print(f"Processing: {puzzle_file}")
+    print(f"{'='*60}")
+
+
+def print_record(record, header=True):
+    """
+    Print the console report for a single record. Pass header=False when
+    print_record_header was already called for it (see iter_solver's
+    on_start).
+    """
+    puzzle_file = record['file']
+    if header:
+        print_record_header(puzzle_file)
+
+    solver_stats = record['solver_stats']
+    if record['warm_start'] is not None:
+        warm = record['warm_start']
+        mapped = solver_stats.get('warm_mapped')
+        mapped = f", {mapped} bridges mapped" if mapped is not None else ""
+        print(f"  Warm start from {warm['source']} (similarity {warm['similarity']:.2f}{mapped})")
+    if 'simplify' in solver_stats:
+        s_stats = solver_stats['simplify']
+        print(f"  Simplified CNF: {s_stats['vars_before']} -> {s_stats['vars_after']} variables, "
+              f"{s_stats['clauses_before']} -> {s_stats['clauses_after']} clauses")
+    if 'solve_time' in solver_stats:
+        print(f"  SAT solver: {solver_stats.get('edges', '?')} potential edges, "
+              f"{solver_stats['conflicts']} conflicts, {solver_stats['solve_time']:.3f}s")
+
+    if record['status'] == 'solved':
+        print(f"✓ SOLVED: {puzzle_file}")
+    elif record['status'] == 'unsolved':
+        if record['precheck_reason'] is not None:
+            print(f"✗ NO SOLUTION found for {puzzle_file} (precheck: {record['precheck_reason']})")
+        else:
+            print(f"✗ NO SOLUTION found for {puzzle_file}")
+    else:
+        print(f"✗ ERROR processing {puzzle_file}: {record['error']}")
+        print(record['traceback'], end='')
+
+
+def append_to_manifest(manifest_file, record):
+    """
+    Append the outcome of a record as one JSON line to manifest_file.
+    The solution itself is not stored, only status, timings and counts.
+    """
+    entry = {
+        'file': os.path.normpath(record['file']),
+        'name': record['name'],
+        'status': record['status'],
+        'error': record['error'],
+        'precheck_reason': record['precheck_reason'],
+        'width': (record['solution'] or {}).get('width'),
+        'height': (record['solution'] or {}).get('height'),
+        'load_time': record['load_time'],
+        'solve_time': record['solve_time'],
+        'num_islands': record['num_islands'],
+        'num_bridges': record['num_bridges']
+    }
+    line = json.dumps(entry, ensure_ascii=False) + '\n'
+    # A crash mid-write can leave a partial last line; start on a new one
+    # so this entry is not glued onto it (load_manifest skips the fragment)
+    if os.path.exists(manifest_file) and os.path.getsize(manifest_file) > 0:
+        with open(manifest_file, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                line = '\n' + line
+    with open(manifest_file, 'a', encoding='utf-8') as f:
+        f.write(line)
+        f.flush()
+
+
+def load_manifest(manifest_file):
+    """
+    Read a manifest written by append_to_manifest.
+
+    Returns:
+        dict: {puzzle file: entry}; for repeated files the last line wins.
+        A missing file gives an empty dict and a truncated last line (crash
+        while writing) is ignored.
+    """
+    entries = {}
+    if not os.path.exists(manifest_file):
+        return entries
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            entries[entry['file']] = entry
+    return entries
+
+
+def completed_files(manifest_file):
+    """
+    Puzzle files already finished (solved or unsolved) in a manifest.
+    Errors are not considered completed so they are retried.
+    """
+    return {f for f, entry in load_manifest(manifest_file).items()
+            if entry['status'] in ('solved', 'unsolved')}
+
+
+def merge_manifests(manifest_files, verbose=True, report_dir=REPORT_DIR):
+    """
+    Combine the manifests of several shards into one stats dict with the
+    same keys as run_solver's, and print its SUMMARY block.
+
+    If the shards wrote a batch report into report_dir, its index is
+    rebuilt so it lists the data files of all of them.
+    """
+    entries = {}
+    for manifest_file in manifest_files:
+        entries.update(load_manifest(manifest_file))
+
+    stats = {
+        'total': len(entries),
+        'solved': 0,
+        'unsolved': 0,
+        'errors': 0
+    }
+    for entry in entries.values():
+        if entry['status'] == 'solved':
+            stats['solved'] += 1
+        elif entry['status'] == 'unsolved':
+            stats['unsolved'] += 1
+        else:
             stats['errors'] += 1
 
+    if os.path.isdir(os.path.join(report_dir, 'data')):
+        index_file = write_report_index(report_dir=report_dir)
+        if verbose:
+            print(f"\nReport: {index_file}")
+
+    if verbose:
+        print_summary(stats)
+    return stats
+
+
+def print_summary(stats):
+    """
+    Print the SUMMARY block for a batch.
+    """
     print(f"\n{'='*60}")
     print("SUMMARY")
     print(f"{'='*60}")
@@ -230,6 +715,192 @@ def run_solver(solver_function, puzzle_pattern='./mypuzzles/*.json', max_puzzles
     print(f"Solved:           {stats['solved']}")
     print(f"Unsolved:         {stats['unsolved']}")
     print(f"Errors:           {stats['errors']}")
+    if 'skipped' in stats:
+        print(f"Skipped (done):   {stats['skipped']}")
+    if 'warm_hits' in stats:
+        print_warm_start_summary(stats)
+    if 'simplified' in stats:
+        print_simplify_summary(stats)
     print(f"{'='*60}")
 
+
+def print_warm_start_summary(stats):
+    """
+    Print the warm-start hit rate and the solve-call time and conflicts of
+    the warm-started puzzles, against a cold solve of the same puzzles when
+    it was measured (warm_baseline).
+    """
+    total = stats['total']
+    hits = stats['warm_hits']
+    rate = hits / total if total else 0.0
+    print(f"Warm starts:      {hits}/{total} ({rate:.0%})")
+    if hits:
+        print(f"Solve warm:       {stats['warm_solve_time']:.3f}s, "
+              f"{stats['warm_conflicts']} conflicts")
+    baseline = stats['baseline_count']
+    if baseline:
+        print(f"Solve cold:       {stats['baseline_solve_time']:.3f}s, "
+              f"{stats['baseline_conflicts']} conflicts ({baseline} same puzzles)")
+        if stats['baseline_warm_time'] > 0:
+            print(f"Speedup:          {stats['baseline_solve_time'] / stats['baseline_warm_time']:.1f}x")
+
+
+def print_simplify_summary(stats):
+    """
+    Print the variables and clauses removed by CNF simplification over the
+    puzzles that were simplified.
+    """
+    print(f"Simplified:       {stats['simplified']}/{stats['total']}")
+    for kind in ('vars', 'clauses'):
+        before = stats[f'{kind}_before']
+        after = stats[f'{kind}_after']
+        reduction = 1 - after / before if before else 0.0
+        print(f"  {kind + ':':<16}{before} -> {after} (-{reduction:.0%})")
+
+
+def run_solver(solver_function, puzzle_pattern='./mypuzzles/*.json', max_puzzles=100,
+               write_files=True, verbose=True, report='per_puzzle', profile_file=None,
+               warm_start=False, warm_mode='assumptions', shard=None, manifest=None,
+               warm_baseline=False, simplify=False):
+    """
+    Run a solver function on all puzzle files matching the pattern.
+
+    Consumes iter_solver: each record is reported on the console (verbose)
+    and written to solutions/ (write_files) as soon as it is available.
+
+    report selects what is written per puzzle:
+        'per_puzzle': solutions/<name>_solution.json and a standalone
+                      solutions/<name>.html
+        'batch': only a compact solutions/report/data/<name>.js, loaded on
+                 demand by a single solutions/report/index.html. Warm start
+                 reads these data files too.
+
+    If profile_file is given, a StageAggregator is attached for the run and
+    its per-stage summary is written there.
+
+    With warm_start, previous solutions in solutions/ seed the solver (see
+    warm_start.py and warm_mode in solver.solve_hashi_true_sat); the summary
+    then also reports the hit rate and the solve-call time and conflicts of
+    the warm-started puzzles. warm_baseline additionally solves each of them
+    cold to report the speedup on the same puzzles.
+
+    simplify runs simplify.simplify_cnf before each solve (see
+    solver.solve_hashi_true_sat); the per-puzzle report and the summary
+    then show the variables and clauses it removed, and the profile its
+    cost (the 'simplify' stage).
+
+    shard ("i/N") restricts the run to one slice of the sorted corpus. With
+    manifest, every finished puzzle is appended to that JSON-lines file and
+    puzzles it already records as done are skipped, so an interrupted run
+    resumes where it stopped; see merge_manifests to combine shards.
+    """
+    if report not in ('per_puzzle', 'batch'):
+        raise ValueError(f"run_solver: unknown report mode {report!r}")
+    if warm_mode not in WARM_MODES:
+        raise ValueError(f"run_solver: unknown warm_mode {warm_mode!r}")
+    report_entries = []
+
+    stats = {
+        'total': 0,
+        'solved': 0,
+        'unsolved': 0,
+        'errors': 0
+    }
+    if warm_start:
+        stats.update({'warm_hits': 0, 'warm_solve_time': 0.0, 'warm_conflicts': 0,
+                      'baseline_count': 0, 'baseline_solve_time': 0.0,
+                      'baseline_warm_time': 0.0, 'baseline_conflicts': 0})
+    if simplify:
+        stats.update({'simplified': 0, 'vars_before': 0, 'vars_after': 0,
+                      'clauses_before': 0, 'clauses_after': 0})
+
+    skip_files = set()
+    if manifest is not None:
+        skip_files = completed_files(manifest)
+        # Puzzles done in a previous run stay listed in the batch report,
+        # since write_report_index lists every data file
+        stats['skipped'] = sum(1 for puzzle_file in list_puzzle_files(puzzle_pattern, max_puzzles, shard)
+                               if os.path.normpath(puzzle_file) in skip_files)
+
+    aggregator = None
+    if profile_file is not None:
+        aggregator = instrumentation.StageAggregator()
+        instrumentation.add_listener(aggregator)
+
+    try:
+        with instrumentation.stage('run_solver', pattern=puzzle_pattern):
+            for record in iter_solver(solver_function, puzzle_pattern, max_puzzles,
+                                      warm_start=warm_start, warm_mode=warm_mode,
+                                      shard=shard, skip_files=skip_files,
+                                      on_start=print_record_header if verbose else None,
+                                      warm_baseline=warm_baseline, simplify=simplify):
+                stats['total'] += 1
+                if record['status'] == 'solved':
+                    stats['solved'] += 1
+                elif record['status'] == 'unsolved':
+                    stats['unsolved'] += 1
+                else:
+                    stats['errors'] += 1
+
+                if warm_start and record['warm_start'] is not None:
+                    solver_stats = record['solver_stats']
+                    solve_time = solver_stats.get('solve_time', record['solve_time'])
+                    stats['warm_hits'] += 1
+                    stats['warm_solve_time'] += solve_time
+                    stats['warm_conflicts'] += solver_stats.get('conflicts', 0)
+                    if 'cold_solve_time' in solver_stats:
+                        stats['baseline_count'] += 1
+                        stats['baseline_solve_time'] += solver_stats['cold_solve_time']
+                        stats['baseline_warm_time'] += solve_time
+                        stats['baseline_conflicts'] += solver_stats['cold_conflicts']
+
+                if simplify and 'simplify' in record['solver_stats']:
+                    stats['simplified'] += 1
+                    for key in ('vars_before', 'vars_after', 'clauses_before', 'clauses_after'):
+                        stats[key] += record['solver_stats']['simplify'][key]
+
+                if verbose:
+                    print_record(record, header=False)
+
+                if write_files and record['solution'] is not None:
+                    try:
+                        with instrumentation.stage('output', file=record['file']):
+                            if report == 'batch':
+                                entry = report_entry(record)
+                                data_file = write_report_data(record['name'], record['solution'],
+                                                              entry=entry)
+                                report_entries.append(entry)
+                                if verbose:
+                                    print(f"  → DATA: {data_file}")
+                            else:
+                                solution_json_file, output_html_file = write_solution_files(record)
+                                if verbose:
+                                    print(f"  → JSON: {solution_json_file}")
+                                    print(f"  → HTML: {output_html_file}")
+                    except Exception as e:
+                        print(f"✗ ERROR processing {record['file']}: {str(e)}")
+                        traceback.print_exc()
+                        stats['errors'] += 1
+                        continue
+
+                if manifest is not None:
+                    append_to_manifest(manifest, record)
+
+            if write_files and report == 'batch':
+                with instrumentation.stage('output'):
+                    index_file = write_report_index(report_entries)
+                if verbose:
+                    print(f"\nReport: {index_file}")
+    finally:
+        if aggregator is not None:
+            instrumentation.remove_listener(aggregator)
+
+    if aggregator is not None:
+        aggregator.write_summary(profile_file)
+        if verbose:
+            print(f"Profile: {profile_file}")
+
+    if verbose:
+        print_summary(stats)
+
     return stats
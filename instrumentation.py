@@ -0,0 +1,206 @@
+"""
+Lightweight instrumentation hooks for the solve pipeline.
+
+Code wraps each stage in `with instrumentation.stage(name, **counters):`.
+Listeners registered with add_listener receive a 'start' and an 'end'
+event (plain dicts) per stage. When no listener is attached, stage()
+returns a shared no-op object and nothing is timed or allocated.
+
+StageAggregator is a ready-made listener that sums durations and counters
+per stage path and writes a flame-style summary for a batch.
+"""
+
+import threading
+import time
+
+
+_listeners = []
+_local = threading.local()
+
+
+def add_listener(listener):
+    """
+    Register a callable that receives every event dict.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener):
+    """
+    Unregister a listener previously added with add_listener.
+    """
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def enabled():
+    """
+    True if at least one listener is attached.
+    """
+    return bool(_listeners)
+
+
+def _emit(event):
+    for listener in list(_listeners):
+        listener(event)
+
+
+class _NullStage:
+    active = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **counters):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    active = True
+
+    def __init__(self, name, counters):
+        self.name = name
+        self.counters = counters
+        self.path = None
+        self.start = None
+
+    def set(self, **counters):
+        """
+        Add or update counters reported in the 'end' event.
+        """
+        self.counters.update(counters)
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self.name)
+        self.path = ';'.join(stack)
+        self.start = time.perf_counter()
+        _emit({
+            'event': 'start',
+            'stage': self.name,
+            'path': self.path,
+            'time': self.start,
+            'counters': dict(self.counters)
+        })
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        _local.stack.pop()
+        _emit({
+            'event': 'end',
+            'stage': self.name,
+            'path': self.path,
+            'time': end,
+            'duration': end - self.start,
+            'error': exc_type.__name__ if exc_type is not None else None,
+            'counters': self.counters
+        })
+        return False
+
+
+def stage(name, **counters):
+    """
+    Context manager delimiting a pipeline stage.
+
+    Args:
+        name (str): Stage name; nested stages form a ';'-separated path
+        **counters: Initial counters (sizes, clause counts...). More can be
+            added inside the block with .set(...)
+
+    Returns:
+        A context manager; its .active attribute is False when no listener
+        is attached, so callers can skip computing expensive counters.
+    """
+    if not _listeners:
+        return _NULL_STAGE
+    return _Stage(name, counters)
+
+
+class StageAggregator:
+    """
+    Listener that aggregates 'end' events per stage path.
+
+    Numeric counters are summed. Counters named in categorical (such as the
+    precheck 'reason') are counted per value, as "<name>:<value>".
+
+        agg = StageAggregator()
+        instrumentation.add_listener(agg)
+        ...
+        instrumentation.remove_listener(agg)
+        agg.write_summary('solutions/profile.txt')
+    """
+
+    def __init__(self, categorical=('reason',)):
+        self.categorical = set(categorical)
+        self.totals = {}
+        self.calls = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        if event['event'] != 'end':
+            return
+        path = event['path']
+        with self._lock:
+            self.totals[path] = self.totals.get(path, 0.0) + event['duration']
+            self.calls[path] = self.calls.get(path, 0) + 1
+            counters = self.counters.setdefault(path, {})
+            for key, value in event['counters'].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    counters[key] = counters.get(key, 0) + value
+                elif key in self.categorical:
+                    label = f"{key}:{value}"
+                    counters[label] = counters.get(label, 0) + 1
+
+    def self_times(self):
+        """
+        Time spent in each stage excluding its child stages.
+        """
+        result = dict(self.totals)
+        for path, total in self.totals.items():
+            parent, sep, _ = path.rpartition(';')
+            if sep and parent in result:
+                result[parent] -= total
+        return result
+
+    def collapsed_stacks(self):
+        """
+        Lines in the collapsed-stack format read by flamegraph tools:
+        "<path> <self time in microseconds>".
+        """
+        self_times = self.self_times()
+        return [f"{path} {max(0, int(round(t * 1e6)))}" for path, t in sorted(self_times.items())]
+
+    def format_table(self):
+        """
+        Human readable per-stage summary, indented by nesting depth.
+        """
+        self_times = self.self_times()
+        lines = [f"{'stage':<40} {'calls':>7} {'total s':>10} {'self s':>10}  counters"]
+        for path in sorted(self.totals):
+            depth = path.count(';')
+            name = '  ' * depth + path.rpartition(';')[2]
+            counters = ', '.join(f"{k}={v}" for k, v in sorted(self.counters[path].items()))
+            lines.append(f"{name:<40} {self.calls[path]:>7} {self.totals[path]:>10.4f} "
+                         f"{self_times[path]:>10.4f}  {counters}")
+        return '\n'.join(lines)
+
+    def write_summary(self, filename):
+        """
+        Write the table followed by the collapsed stacks to filename.
+        """
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(self.format_table())
+            f.write('\n\n# collapsed stacks (self time, microseconds)\n')
+            f.write('\n'.join(self.collapsed_stacks()))
+            f.write('\n')
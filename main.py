@@ -7,16 +7,44 @@ Ejecuta este archivo usando tu implementación para resolver los puzles Hashi.
 Configuración:
     – Ubicación de los archivos de los puzles: cambia PUZZLE_PATTERN
     – Número máximo de puzles: cambia MAX_PUZZLES
+    – Tipo de informe HTML: cambia REPORT ('per_puzzle' o 'batch')
+    – Reutilizar soluciones anteriores como pista: cambia WARM_START
+      (WARM_BASELINE = True mide también la resolución en frío para comparar)
+    – Simplificar el CNF antes de resolver: cambia SIMPLIFY
+
+Opciones de línea de comandos (para repartir un corpus entre máquinas):
+    --shard i/N         resuelve solo la parte i (0..N-1) de N
+    --manifest FICHERO  registra cada puzle terminado y se salta los ya hechos
+    --merge F1 F2 ...   combina los manifiestos de varias partes en un resumen
 """
 
+import argparse
+
 import infrastructure
 import solver
 
 # Configuracion
 PUZZLE_PATTERN = './mypuzzles/*.json'  
 MAX_PUZZLES = 10                       
+REPORT = 'per_puzzle'   # 'batch': un único solutions/report/index.html
+WARM_START = False      # True: usa solutions/*_solution.json como pista
+WARM_BASELINE = False   # True: resuelve también en frío los puzles con pista
+SIMPLIFY = False        # True: simplifica el CNF (ver simplify.py)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hashi puzzle solver")
+    parser.add_argument('--shard', help="parte a resolver, 'i/N' con 0 <= i < N")
+    parser.add_argument('--manifest', help="fichero JSON lines con el progreso")
+    parser.add_argument('--merge', nargs='+', metavar='MANIFEST',
+                        help="combina manifiestos y muestra el resumen")
+    return parser.parse_args()
+
 
 def main():
+    args = parse_args()
+    if args.merge:
+        return infrastructure.merge_manifests(args.merge)
+
     print("""
 ===========
 HASHI PUZZLE                                
@@ -26,11 +54,19 @@ HASHI PUZZLE
     print("Iniciando el programa que resuelve los puzles")
     print("Patrón de puzles: " + str(PUZZLE_PATTERN))
     print("Número máximo de puzles: " + str(MAX_PUZZLES))
+    if args.shard:
+        print("Parte: " + args.shard)
         
     stats = infrastructure.run_solver(
         solver_function=solver.solve_hashi_true_sat,
         puzzle_pattern=PUZZLE_PATTERN,
-        max_puzzles=MAX_PUZZLES
+        max_puzzles=MAX_PUZZLES,
+        report=REPORT,
+        warm_start=WARM_START,
+        warm_baseline=WARM_BASELINE,
+        simplify=SIMPLIFY,
+        shard=args.shard,
+        manifest=args.manifest
     )
     
     print("\n¡Terminado! Revisa la carpeta 'solutions/' para ver los resultados.")
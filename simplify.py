@@ -0,0 +1,390 @@
+"""
+CNF simplification between encoding and solver bootstrap.
+
+simplify_cnf applies, in order:
+    - tautology, duplicate-literal and duplicate-clause removal
+    - unit propagation
+    - equivalent-literal substitution (SCCs of the binary implication graph)
+    - backward subsumption
+    - bounded variable elimination (resolvents may not outnumber the
+      clauses they replace)
+
+Variables listed as frozen (the b1/b2 bridge variables) are never
+eliminated, and when they are fixed or substituted extend_model puts their
+value back, so formated_sol can decode the model as before.
+"""
+
+
+class _Simplifier:
+
+    def __init__(self, frozen):
+        self.frozen = frozen
+        self.clauses = []
+        self.occ = {}
+        self.fixed = {}
+        self.queue = []
+        self.equivalences = {}
+        self.unsat = False
+
+    # -- clause database -------------------------------------------------
+
+    def add(self, lits):
+        """
+        Add a clause, normalizing it against the current assignment.
+        """
+        clause = []
+        seen = set()
+        for lit in lits:
+            value = self.fixed.get(abs(lit))
+            if value is not None:
+                if value == (lit > 0):
+                    return
+                continue
+            if -lit in seen:
+                return
+            if lit not in seen:
+                seen.add(lit)
+                clause.append(lit)
+
+        if not clause:
+            self.unsat = True
+        elif len(clause) == 1:
+            self.assign(clause[0])
+        else:
+            idx = len(self.clauses)
+            self.clauses.append(clause)
+            occ = self.occ
+            for lit in clause:
+                if lit in occ:
+                    occ[lit].add(idx)
+                else:
+                    occ[lit] = {idx}
+
+    def remove(self, idx):
+        for lit in self.clauses[idx]:
+            self.occ[lit].discard(idx)
+        self.clauses[idx] = None
+
+    def live_clauses(self):
+        return [c for c in self.clauses if c is not None]
+
+    # -- unit propagation ------------------------------------------------
+
+    def assign(self, lit):
+        var = abs(lit)
+        value = self.fixed.get(var)
+        if value is None:
+            self.fixed[var] = lit > 0
+            self.queue.append(lit)
+        elif value != (lit > 0):
+            self.unsat = True
+
+    def propagate(self):
+        occ = self.occ
+        while self.queue and not self.unsat:
+            lit = self.queue.pop()
+            for idx in list(occ.get(lit, ())):
+                self.remove(idx)
+            for idx in list(occ.get(-lit, ())):
+                clause = self.clauses[idx]
+                clause.remove(-lit)
+                occ[-lit].discard(idx)
+                if len(clause) == 1:
+                    self.remove(idx)
+                    self.assign(clause[0])
+                elif not clause:
+                    self.unsat = True
+
+    # -- equivalent literals ---------------------------------------------
+
+    def _binary_sccs(self):
+        graph = {}
+        for clause in self.clauses:
+            if clause is not None and len(clause) == 2:
+                a, b = clause
+                graph.setdefault(-a, []).append(b)
+                graph.setdefault(-b, []).append(a)
+
+        # Iterative Tarjan
+        index = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        sccs = []
+        counter = 0
+        for start in graph:
+            if start in index:
+                continue
+            work = [(start, 0)]
+            index[start] = low[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, i = work[-1]
+                succ = graph.get(node, ())
+                if i < len(succ):
+                    work[-1] = (node, i + 1)
+                    nxt = succ[i]
+                    if nxt not in index:
+                        index[nxt] = low[nxt] = counter
+                        counter += 1
+                        stack.append(nxt)
+                        on_stack.add(nxt)
+                        work.append((nxt, 0))
+                    elif nxt in on_stack:
+                        low[node] = min(low[node], index[nxt])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        scc = []
+                        while True:
+                            lit = stack.pop()
+                            on_stack.discard(lit)
+                            scc.append(lit)
+                            if lit == node:
+                                break
+                        if len(scc) > 1:
+                            sccs.append(scc)
+        return sccs
+
+    def substitute_equivalences(self):
+        """
+        Replace every literal of a binary-implication SCC by one
+        representative, preferring a frozen variable. Returns the number of
+        substituted variables.
+        """
+        repr_of = {}
+        for scc in self._binary_sccs():
+            if scc[0] in repr_of:
+                continue
+            members = set(scc)
+            if any(-lit in members for lit in scc):
+                self.unsat = True
+                return 0
+            frozen_lits = [lit for lit in scc if abs(lit) in self.frozen]
+            rep = min(frozen_lits, key=abs) if frozen_lits else min(scc, key=abs)
+            for lit in scc:
+                if lit != rep:
+                    repr_of[lit] = rep
+                    repr_of[-lit] = -rep
+
+        substituted = 0
+        for lit, rep in repr_of.items():
+            if lit < 0:
+                continue
+            substituted += 1
+            self.equivalences[lit] = rep
+            for old in (lit, -lit):
+                for idx in list(self.occ.get(old, ())):
+                    clause = self.clauses[idx]
+                    self.remove(idx)
+                    self.add([repr_of.get(l, l) for l in clause])
+        self.propagate()
+        return substituted
+
+    # -- subsumption -----------------------------------------------------
+
+    def subsume(self):
+        removed = 0
+        occ = self.occ
+        order = sorted((i for i, c in enumerate(self.clauses) if c is not None),
+                       key=lambda i: len(self.clauses[i]))
+        for idx in order:
+            clause = self.clauses[idx]
+            if clause is None:
+                continue
+            pivot = min(clause, key=lambda l: len(occ[l]))
+            clause_set = set(clause)
+            size = len(clause)
+            for other in list(occ[pivot]):
+                if other == idx:
+                    continue
+                candidate = self.clauses[other]
+                if len(candidate) >= size and clause_set.issubset(candidate):
+                    self.remove(other)
+                    removed += 1
+        return removed
+
+    # -- bounded variable elimination ------------------------------------
+
+    def eliminate(self, max_occurrences=16, max_resolvent=16):
+        occ = self.occ
+        candidates = set()
+        for lit, idxs in occ.items():
+            var = abs(lit)
+            if idxs and var not in self.frozen and var not in self.fixed \
+                    and var not in self.equivalences:
+                candidates.add(var)
+
+        def cost(var):
+            return len(occ.get(var, ())) * len(occ.get(-var, ()))
+
+        eliminated = 0
+        for var in sorted(candidates, key=cost):
+            if self.unsat:
+                break
+            if var in self.fixed:
+                continue
+            pos = list(occ.get(var, ()))
+            neg = list(occ.get(-var, ()))
+            if len(pos) + len(neg) > max_occurrences:
+                continue
+
+            limit = len(pos) + len(neg)
+            resolvents = []
+            for p in pos:
+                p_rest = [l for l in self.clauses[p] if l != var]
+                p_set = set(p_rest)
+                for n in neg:
+                    resolvent = set(p_set)
+                    tautology = False
+                    for l in self.clauses[n]:
+                        if l == -var:
+                            continue
+                        if -l in resolvent:
+                            tautology = True
+                            break
+                        resolvent.add(l)
+                    if tautology:
+                        continue
+                    if len(resolvent) > max_resolvent:
+                        resolvents = None
+                        break
+                    resolvents.append(list(resolvent))
+                    if len(resolvents) > limit:
+                        resolvents = None
+                        break
+                if resolvents is None:
+                    break
+            if resolvents is None:
+                continue
+
+            for idx in pos + neg:
+                self.remove(idx)
+            for resolvent in resolvents:
+                self.add(resolvent)
+            self.propagate()
+            eliminated += 1
+        return eliminated
+
+
+def _count_vars(clauses):
+    return len({abs(lit) for clause in clauses for lit in clause})
+
+
+def simplify_cnf(clauses, frozen=(), elimination=True):
+    """
+    Simplify a list of clauses.
+
+    Args:
+        clauses (list): Clauses as lists of integer literals
+        frozen (iterable): Variables that must stay decodable from the model
+        elimination (bool): Run bounded variable elimination
+
+    Returns:
+        dict:
+            - clauses: simplified clauses (empty list if unsat)
+            - unsat: True if the formula was found unsatisfiable
+            - fixed: literals fixed by unit propagation
+            - equivalences: {var: representative literal}
+            - stats: variables/clauses before and after, and per-step counts
+    """
+    simplifier = _Simplifier(set(frozen))
+    vars_before = _count_vars(clauses)
+
+    unique = set()
+    duplicates = 0
+    for clause in clauses:
+        key = tuple(sorted(set(clause)))
+        if key in unique:
+            duplicates += 1
+            continue
+        unique.add(key)
+        simplifier.add(clause)
+        if simplifier.unsat:
+            break
+    del unique
+
+    stats = {
+        'vars_before': vars_before,
+        'clauses_before': len(clauses),
+        'duplicates': duplicates,
+        'substituted': 0,
+        'subsumed': 0,
+        'eliminated': 0
+    }
+
+    simplifier.propagate()
+    if not simplifier.unsat:
+        stats['substituted'] = simplifier.substitute_equivalences()
+    if not simplifier.unsat:
+        stats['subsumed'] = simplifier.subsume()
+    if not simplifier.unsat and elimination:
+        stats['eliminated'] = simplifier.eliminate()
+        simplifier.propagate()
+
+    result_clauses = [] if simplifier.unsat else simplifier.live_clauses()
+    stats['fixed'] = len(simplifier.fixed)
+    stats['vars_after'] = _count_vars(result_clauses)
+    stats['clauses_after'] = len(result_clauses)
+
+    return {
+        'clauses': result_clauses,
+        'unsat': simplifier.unsat,
+        'fixed': [var if value else -var for var, value in simplifier.fixed.items()],
+        'equivalences': simplifier.equivalences,
+        'stats': stats
+    }
+
+
+def map_literals(lits, result):
+    """
+    Translate literals of the original formula (e.g. warm-start hints) to
+    the simplified one: fixed variables are dropped and substituted ones
+    are replaced by their representative.
+    """
+    fixed = {abs(lit) for lit in result['fixed']}
+    equivalences = result['equivalences']
+    mapped = []
+    for lit in lits:
+        var = abs(lit)
+        while var in equivalences and var not in fixed:
+            rep = equivalences[var]
+            lit = rep if lit > 0 else -rep
+            var = abs(lit)
+        if var not in fixed:
+            mapped.append(lit)
+    return mapped
+
+
+def extend_model(model, result):
+    """
+    Extend a model of the simplified formula with the fixed and substituted
+    variables.
+
+    Returns:
+        set: True literals of the extended model
+    """
+    equivalences = result['equivalences']
+    values = {abs(lit): lit > 0 for lit in model if abs(lit) not in equivalences}
+    for lit in result['fixed']:
+        values[abs(lit)] = lit > 0
+
+    def value_of(var):
+        if var in values:
+            return values[var]
+        rep = equivalences.get(var)
+        if rep is None:
+            return False
+        value = value_of(abs(rep)) == (rep > 0)
+        values[var] = value
+        return value
+
+    for var in equivalences:
+        value_of(var)
+
+    return {var if value else -var for var, value in values.items()}
@@ -20,7 +20,12 @@ La función debe:
     NO modificar otros archivos.
 """
 
+import time
+
 from implemented_functions import add_connectivity_constraints, formated_sol
+import instrumentation
+from simplify import extend_model, map_literals, simplify_cnf
+from warm_start import WARM_MODES, bridge_hints, hint_distances
 
 
 from pysat.solvers import Glucose3 # type: ignore
@@ -30,6 +35,12 @@ from pysat.card import CardEnc # pyright: ignore[reportMissingImports]
 # IDPool global para todas las variables
 variables = IDPool()
 
+# Warm start con suposiciones: como mucho WARM_START_ROUNDS intentos, cada
+# uno con un presupuesto de WARM_START_BUDGET conflictos; tras cada fallo
+# se quitan las suposiciones del núcleo (get_core) y se vuelve a probar.
+WARM_START_ROUNDS = 8
+WARM_START_BUDGET = 1000
+
 
 """
 ===================================================================
@@ -187,7 +198,98 @@ def add_required_bridges_contraints(nodes, edges, cnf, required_bridges):
     return cnf
     
     
-def solve_hashi_true_sat(dimensions, islands_data):
+def check_infeasible(nodes, edges, required_bridges):
+    """
+    Comprobaciones rápidas, en O(n + E), que demuestran que el puzle no
+    tiene solución sin necesidad de construir el CNF. Se llama justo
+    después de construct_edges.
+
+    Devuelve None si ninguna comprobación falla, o un diccionario
+    {"reason": str, "islands": [índices]} con el motivo:
+        - "odd_total": la suma de puentes requeridos es impar (cada
+          puente suma 2).
+        - "capacity": una isla pide más de 2 puentes por vecino candidato
+          (o 0 puentes habiendo más islas).
+        - "neighbour_capacity": una isla pide más de lo que sus vecinos
+          pueden aportar, min(2, requeridos del vecino) cada uno.
+        - "disconnected_candidates": el grafo de aristas candidatas ya no
+          es conexo.
+        - "isolated_pair": una isla con un único vecino que pide lo mismo
+          que ella (1-1 o 2-2); ambas se cierran en una componente aislada.
+    """
+    n = len(nodes)
+    
+    if sum(required_bridges) % 2 != 0:
+        return {"reason": "odd_total", "islands": []}
+    
+    neighbours = [[] for _ in range(n)]
+    for i, j in edges:
+        neighbours[i].append(j)
+        neighbours[j].append(i)
+    
+    for i in range(n):
+        req = required_bridges[i]
+        if req > 2 * len(neighbours[i]) or (req < 1 and n > 1):
+            return {"reason": "capacity", "islands": [i]}
+        if req > sum(min(2, required_bridges[j]) for j in neighbours[i]):
+            return {"reason": "neighbour_capacity", "islands": [i]}
+    
+    if n > 1:
+        seen = [False] * n
+        seen[0] = True
+        stack = [0]
+        while stack:
+            v = stack.pop()
+            for w in neighbours[v]:
+                if not seen[w]:
+                    seen[w] = True
+                    stack.append(w)
+        if not all(seen):
+            return {"reason": "disconnected_candidates",
+                    "islands": [v for v in range(n) if not seen[v]]}
+    
+    if n > 2:
+        for i in range(n):
+            if len(neighbours[i]) == 1:
+                j = neighbours[i][0]
+                if required_bridges[i] == required_bridges[j]:
+                    return {"reason": "isolated_pair", "islands": [i, j]}
+    
+    return None
+    
+    
+def warm_start_phases(nodes, edges, hints):
+    """
+    Polaridades iniciales para el warm start a partir de los puentes
+    sugeridos (ver warm_start.bridge_hints): las de b1/b2 y, para las
+    variables de conectividad r(v,t) y x(e,v,t), las del modelo en el que
+    los puentes sugeridos fueran la solución. Solo se devuelven los
+    literales positivos de r/x; el resto queda a False, la polaridad por
+    defecto del solver.
+    """
+    lits = []
+    for e, bridges in enumerate(hints):
+        b1 = variables.id(('b1', e))
+        b2 = variables.id(('b2', e))
+        lits.append(b1 if bridges >= 1 else -b1)
+        lits.append(b2 if bridges == 2 else -b2)
+
+    n = len(nodes)
+    distances = hint_distances(n, edges, hints)
+    for v, d in enumerate(distances):
+        if d is not None:
+            lits.extend(variables.id(('r', v, t)) for t in range(d, n))
+    for e, (i, j) in enumerate(edges):
+        if not hints[e]:
+            continue
+        for v, other in ((i, j), (j, i)):
+            if distances[other] is not None:
+                lits.extend(variables.id(('x', e, v, t)) for t in range(distances[other] + 1, n))
+    return lits
+
+
+def solve_hashi_true_sat(dimensions, islands_data, previous_solution=None, warm_mode='assumptions',
+                         simplify=False, diagnostics=None, measure_cold=False):
     """
     Resolver un puzle Hashi utilizando programación por restricciones.
 
@@ -199,6 +301,42 @@ def solve_hashi_true_sat(dimensions, islands_data):
             [x, y, required_bridges]
                x, y: coordenadas (empezando en 0)
                required_bridges: número de puentes necesarios (de 1 a 8).
+        previous_solution (dict): Solución guardada (formato _solution.json)
+                           de este puzle o de uno parecido. Opcional; sus
+                           puentes se usan como pista para el solver.
+        warm_mode (str): Cómo se usa previous_solution:
+               'assumptions': polaridades iniciales y, además, los puentes
+                              de la pista se suponen ciertos (solo los
+                              positivos). Si chocan con el puzle, se quitan
+                              las suposiciones del núcleo y se reintenta,
+                              con un presupuesto de conflictos por intento
+                              (por defecto).
+               'phases': solo polaridades iniciales (set_phases), ver
+                         warm_start_phases.
+               Cualquier otro valor lanza ValueError.
+        simplify (bool): Simplificar el CNF antes de crear el solver
+                           (ver simplify.py). Las variables b1/b2 se
+                           conservan para que formated_sol decodifique el
+                           modelo. Desactivado por defecto: reduce el CNF
+                           y el tiempo de solve, pero la pasada en Python
+                           cuesta más de lo que ahorra.
+        diagnostics (dict): Opcional. La función no imprime nada; lo que
+               antes mostraba por consola se deja aquí:
+               "precheck": el diccionario de check_infeasible cuando el
+                           puzle se descarta antes de codificarlo, o None.
+               "edges": número de aristas candidatas.
+               "simplify": estadísticas de simplify_cnf (con simplify).
+               "warm_mapped": puentes de previous_solution que coinciden
+                           con aristas candidatas.
+               "solve_time", "conflicts": tiempo (s) y conflictos de la
+                           llamada al solver, sin codificación.
+               "cold_solve_time", "cold_conflicts": lo mismo resolviendo
+                           sin pista (solo con previous_solution y
+                           measure_cold).
+               "cold_baseline_time": tiempo total de esa línea base,
+                           incluida la creación del solver.
+        measure_cold (bool): Con previous_solution, resolver también el mismo
+                           CNF en frío para medir la ganancia del warm start.
 
     Devuelve:
     =========    
@@ -249,27 +387,135 @@ def solve_hashi_true_sat(dimensions, islands_data):
     [3,1] a [3,2] con 1 puente. 
     """
     
+    if warm_mode not in WARM_MODES:
+        raise ValueError(f"solve_hashi_true_sat: unknown warm_mode {warm_mode!r}")
+    
     nodes = [[isle[0], isle[1]] for isle in islands_data]
     required_bridges = [isle[2] for isle in islands_data]
     
-    cnf = CNF()
-    
-    edges = construct_edges(nodes)  #TODO
-    cnf = add_bridge_2_implise_bridg_1(edges, cnf)  #TODO
-    cnf = add_crossing_constraints(nodes, edges, cnf)   #TODO
-    cnf = add_required_bridges_contraints(nodes, edges, cnf, required_bridges)  #TODO
-    cnf = add_connectivity_constraints(nodes, edges, cnf, variables)    # Hecha en implemented_functions
-           
-    # Se inicializa el solver, y se devuelve la solución.
-    print(f"Starting SAT solver with {len(edges)} potential edges")
-    with Glucose3(bootstrap_with=cnf) as sat:
-        if sat.solve():
-            print("✓ Solution found")
-            solution = sat.get_model()
-            return formated_sol(dimensions, nodes, edges, solution, variables)  # Hecha en implemented_functions
-        else:
-            print("✗ Solution not found")
+    with instrumentation.stage('solve_hashi_true_sat', islands=len(nodes)):
+        cnf = CNF()
+        
+        with instrumentation.stage('edges') as st:
+            edges = construct_edges(nodes)  #TODO
+            st.set(edges=len(edges))
+        
+        with instrumentation.stage('precheck') as st:
+            rejection = check_infeasible(nodes, edges, required_bridges)
+            if diagnostics is not None:
+                diagnostics["precheck"] = rejection
+            st.set(rejected=int(rejection is not None))
+            if rejection is not None:
+                st.set(reason=rejection["reason"])
+        if rejection is not None:
             return None
+        
+        with instrumentation.stage('encode.b2_b1') as st:
+            before = len(cnf.clauses)
+            cnf = add_bridge_2_implise_bridg_1(edges, cnf)  #TODO
+            st.set(clauses=len(cnf.clauses) - before)
+        
+        with instrumentation.stage('encode.crossing') as st:
+            before = len(cnf.clauses)
+            cnf = add_crossing_constraints(nodes, edges, cnf)   #TODO
+            st.set(clauses=len(cnf.clauses) - before)
+        
+        with instrumentation.stage('encode.cardinality') as st:
+            before = len(cnf.clauses)
+            cnf = add_required_bridges_contraints(nodes, edges, cnf, required_bridges)  #TODO
+            st.set(clauses=len(cnf.clauses) - before)
+        
+        with instrumentation.stage('encode.connectivity') as st:
+            before = len(cnf.clauses)
+            cnf = add_connectivity_constraints(nodes, edges, cnf, variables)    # Hecha en implemented_functions
+            st.set(clauses=len(cnf.clauses) - before)
+               
+        simplified = None
+        if simplify:
+            with instrumentation.stage('simplify') as st:
+                frozen = [variables.id((kind, e)) for e in range(len(edges)) for kind in ('b1', 'b2')]
+                simplified = simplify_cnf(cnf.clauses, frozen)
+                st.set(**simplified['stats'])
+            if diagnostics is not None:
+                diagnostics["simplify"] = simplified['stats']
+            if simplified['unsat']:
+                return None
+            clauses = simplified['clauses']
+        else:
+            clauses = cnf.clauses
+               
+        # Se inicializa el solver, y se devuelve la solución.
+        if diagnostics is not None:
+            diagnostics["edges"] = len(edges)
+        with instrumentation.stage('bootstrap', clauses=len(clauses)):
+            sat = Glucose3(bootstrap_with=clauses)
+        
+        with sat:
+            assumptions = []
+            if previous_solution is not None:
+                with instrumentation.stage('warm_start') as st:
+                    hints, mapped = bridge_hints(nodes, edges, previous_solution)
+                    phases = warm_start_phases(nodes, edges, hints)
+                    if warm_mode == 'assumptions':
+                        # Solo los puentes de la pista: suponer también los
+                        # que no estaban chocaría con cualquier edición
+                        assumptions = [lit for lit in phases[:2 * len(edges)] if lit > 0]
+                    if simplified is not None:
+                        phases = map_literals(phases, simplified)
+                        assumptions = map_literals(assumptions, simplified)
+                    sat.set_phases(phases)
+                    st.set(mapped=mapped, assumed=len(assumptions))
+                if diagnostics is not None:
+                    diagnostics["warm_mapped"] = mapped
+
+            with instrumentation.stage('solve') as st:
+                t0 = time.perf_counter()
+                found = None
+                rounds = 0
+                while assumptions and rounds < WARM_START_ROUNDS:
+                    rounds += 1
+                    sat.conf_budget(WARM_START_BUDGET)
+                    found = sat.solve_limited(assumptions=assumptions)
+                    if found is not False:
+                        break
+                    core = sat.get_core()
+                    if not core:
+                        # Insatisfacible incluso sin suposiciones
+                        break
+                    core = set(core)
+                    assumptions = [lit for lit in assumptions if lit not in core]
+                    found = None
+                if rounds:
+                    st.set(warm_rounds=rounds, hint_accepted=int(found is True))
+                if found is None:
+                    found = sat.solve()
+                t1 = time.perf_counter()
+                if st.active or diagnostics is not None:
+                    conflicts = sat.accum_stats().get('conflicts', 0)
+                    st.set(conflicts=conflicts)
+                    if diagnostics is not None:
+                        diagnostics["solve_time"] = t1 - t0
+                        diagnostics["conflicts"] = conflicts
+            
+            if previous_solution is not None and measure_cold and diagnostics is not None:
+                # Línea base: el mismo CNF resuelto sin pista
+                with instrumentation.stage('cold_baseline'):
+                    t_start = time.perf_counter()
+                    with Glucose3(bootstrap_with=clauses) as cold:
+                        t0 = time.perf_counter()
+                        cold.solve()
+                        diagnostics["cold_solve_time"] = time.perf_counter() - t0
+                        diagnostics["cold_conflicts"] = cold.accum_stats().get('conflicts', 0)
+                    diagnostics["cold_baseline_time"] = time.perf_counter() - t_start
+            
+            if found:
+                with instrumentation.stage('decode'):
+                    solution = sat.get_model()
+                    if simplified is not None:
+                        solution = extend_model(solution, simplified)
+                    return formated_sol(dimensions, nodes, edges, solution, variables)  # Hecha en implemented_functions
+            else:
+                return None
 
 
 def test():
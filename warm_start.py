@@ -0,0 +1,201 @@
+"""
+Warm-start support: reuse previously stored solutions as solver hints.
+
+A SolutionIndex scans solutions/*_solution.json and the batch report's
+solutions/report/data/*.js once per batch and finds, for a new puzzle, the
+stored solution with the same name or the most similar island layout.
+bridge_hints maps its bridges onto the candidate edge list built by
+construct_edges, by island coordinates, so renumbered ids and small edits
+still match. hint_distances gives the BFS layers of the hinted bridges,
+used to seed the phases of the connectivity variables.
+"""
+
+import glob
+import json
+import os
+
+
+# Accepted values of solver.solve_hashi_true_sat's warm_mode
+WARM_MODES = ('assumptions', 'phases')
+
+
+def island_signature(islands):
+    """
+    Set of (x, y, required_bridges) for a list of islands; ids are ignored.
+    """
+    return frozenset((isl[0], isl[1], isl[2]) for isl in islands
+                     if isinstance(isl, list) and len(isl) >= 3)
+
+
+def similarity(sig_a, sig_b):
+    """
+    Jaccard similarity of two island signatures.
+    """
+    if not sig_a and not sig_b:
+        return 1.0
+    return len(sig_a & sig_b) / len(sig_a | sig_b)
+
+
+class SolutionIndex:
+    """
+    Index of the stored solutions of a directory.
+
+    Only island signatures are kept in memory; the chosen solution is read
+    from disk when it is requested.
+    """
+
+    def __init__(self, solutions_dir='solutions', min_similarity=0.8):
+        self.solutions_dir = solutions_dir
+        self.min_similarity = min_similarity
+        self.entries = {}
+        candidates = {}
+        for path in glob.glob(os.path.join(solutions_dir, '*_solution.json')):
+            candidates.setdefault(os.path.basename(path)[:-len('_solution.json')], []).append(path)
+        for path in glob.glob(os.path.join(solutions_dir, 'report', 'data', '*.js')):
+            candidates.setdefault(os.path.basename(path)[:-len('.js')], []).append(path)
+
+        for name, paths in candidates.items():
+            # The most recently written solution of a puzzle wins
+            for path in sorted(paths, key=os.path.getmtime, reverse=True):
+                data = read_solution(path)
+                if data is not None and data.get('solution'):
+                    self.entries[name] = (path, island_signature(data.get('islands', [])))
+                    break
+
+    def find(self, islands_data, name=None):
+        """
+        Find a previous solution for a puzzle.
+
+        The entry with the same name is preferred when it is similar enough;
+        otherwise the most similar entry above min_similarity is used.
+
+        Returns:
+            tuple: (solution_dict, source_name, similarity) or None
+        """
+        sig = island_signature(islands_data)
+        best = None
+
+        if name in self.entries:
+            score = similarity(sig, self.entries[name][1])
+            if score >= self.min_similarity:
+                best = (name, score)
+
+        if best is None:
+            for other, (_, other_sig) in self.entries.items():
+                score = similarity(sig, other_sig)
+                if score >= self.min_similarity and (best is None or score > best[1]):
+                    best = (other, score)
+                    if score == 1.0:
+                        break
+
+        if best is None:
+            return None
+
+        data = read_solution(self.entries[best[0]][0])
+        if data is None:
+            return None
+        return data, best[0], best[1]
+
+
+def read_solution(path):
+    """
+    Read a stored solution: either a <name>_solution.json or a batch report
+    data file (report/data/<name>.js), converted back to the solution dict
+    format. Returns None if the file cannot be read.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        if not path.endswith('.js'):
+            data = json.loads(content)
+            return data if isinstance(data, dict) else None
+
+        # [// index entry line]
+        # hashiReport.load("<name>",{...});
+        decoder = json.JSONDecoder()
+        start = content.index('hashiReport.load(') + len('hashiReport.load(')
+        _, end = decoder.raw_decode(content, start)
+        compact, _ = decoder.raw_decode(content, end + 1)
+        return {
+            "width": compact["w"],
+            "height": compact["h"],
+            "islands": compact["islands"],
+            "solution": [{"x1": x1, "y1": y1, "x2": x2, "y2": y2, "bridges": bridges}
+                         for x1, y1, x2, y2, bridges in compact["solution"]]
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def previous_bridge_counts(previous_solution):
+    """
+    Map {((x1, y1), (x2, y2)) sorted: bridges} from a stored solution.
+    Bridges given by island ids (id1/id2) are resolved with its islands.
+    """
+    by_id = {isl[3]: (isl[0], isl[1]) for isl in previous_solution.get('islands', [])
+             if isinstance(isl, list) and len(isl) >= 4}
+    counts = {}
+    for bridge in previous_solution.get('solution', []):
+        if not isinstance(bridge, dict):
+            continue
+        if all(k in bridge for k in ('x1', 'y1', 'x2', 'y2')):
+            a, b = (bridge['x1'], bridge['y1']), (bridge['x2'], bridge['y2'])
+        elif bridge.get('id1') in by_id and bridge.get('id2') in by_id:
+            a, b = by_id[bridge['id1']], by_id[bridge['id2']]
+        else:
+            continue
+        counts[tuple(sorted((a, b)))] = bridge.get('bridges', 0)
+    return counts
+
+
+def bridge_hints(nodes, edges, previous_solution):
+    """
+    Project a previous solution onto the candidate edges.
+
+    Args:
+        nodes (list): [x, y] per island
+        edges (list): Candidate edges [i, j] from construct_edges
+        previous_solution (dict): Stored solution
+
+    Returns:
+        tuple: (hints, mapped)
+            - hints: bridges (0, 1 or 2) suggested for each edge index
+            - mapped: number of previous bridges that matched a candidate edge
+    """
+    counts = previous_bridge_counts(previous_solution)
+    hints = []
+    mapped = 0
+    for i, j in edges:
+        key = tuple(sorted(((nodes[i][0], nodes[i][1]), (nodes[j][0], nodes[j][1]))))
+        bridges = counts.get(key, 0)
+        if bridges:
+            mapped += 1
+        hints.append(bridges)
+    return hints, mapped
+
+
+def hint_distances(num_nodes, edges, hints, root=0):
+    """
+    Bridges needed to reach each island from root using only the edges the
+    hints bridge (None if unreachable); the layers of the BFS encoding in
+    implemented_functions.add_connectivity_constraints.
+    """
+    neighbours = [[] for _ in range(num_nodes)]
+    for (i, j), bridges in zip(edges, hints):
+        if bridges:
+            neighbours[i].append(j)
+            neighbours[j].append(i)
+    distances = [None] * num_nodes
+    if not num_nodes:
+        return distances
+    distances[root] = 0
+    frontier = [root]
+    while frontier:
+        nxt = []
+        for v in frontier:
+            for w in neighbours[v]:
+                if distances[w] is None:
+                    distances[w] = distances[v] + 1
+                    nxt.append(w)
+        frontier = nxt
+    return distances